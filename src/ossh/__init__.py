@@ -1,39 +1,62 @@
 #!/usr/bin/env python3
 
 import os
-import re
 import sys
 import signal
+from operator import itemgetter
 from pathlib import Path
 from typing import List, Dict, Tuple
-from rich import box
-from rich.prompt import Prompt, Confirm
-from rich.table import Table
-from rich.panel import Panel
-from rich.console import Console
-from rich.text import Text
-from rich import print as rprint
 
 # Constants
-SSH_CONFIG_PATH = str(Path.home() / ".ssh/config")
-DEFAULT_SSH_KEY = str(Path.home() / ".ssh/id_rsa")
-console = Console()
+_SSH_DIR = Path.home() / ".ssh"
+SSH_CONFIG_PATH = str(_SSH_DIR / "config")
+DEFAULT_SSH_KEY = str(_SSH_DIR / "id_rsa")
+_IS_TTY = sys.stdout.isatty()
+
+class _LazyConsole:
+    """Stand-in for rich's Console that defers importing rich until first use"""
+
+    _console = None
+
+    def __getattr__(self, name):
+        if _LazyConsole._console is None:
+            from rich.console import Console
+            _LazyConsole._console = Console()
+        return getattr(_LazyConsole._console, name)
+
+console = _LazyConsole()
+
+# SSH config keywords mapped to server fields
+_CONFIG_KEYS = {
+    "hostname": "hostname",
+    "user": "user",
+    "identityfile": "identity",
+    "port": "port",
+}
+
+# Whitespace stripped out by validate_name's translate() check
+_BAD_CHARS = str.maketrans('', '', ' \t\n\r')
+
+# Last parse result, keyed on the config file's (path, mtime, size)
+_PARSE_CACHE = {"key": None, "value": None}
 
 def handle_exit(signum, frame):
-    """Handle clean exit on Ctrl+C"""
+    """Handle clean exit on SIGTERM"""
     console.print("\n[yellow]👋 Thank you for using ossh! Goodbye![/yellow]")
     sys.exit(0)
 
 def validate_name(name: str) -> Tuple[bool, str]:
     """Validate server name or hostname"""
-    if ' ' in name:
-        return False, "Name cannot contain spaces"
     if not name:
         return False, "Name cannot be empty"
+    if len(name.translate(_BAD_CHARS)) != len(name):
+        return False, "Name cannot contain whitespace"
     return True, ""
 
 def get_valid_input(prompt: str, current_value: str = "") -> str:
     """Get valid input from user"""
+    from rich.prompt import Prompt
+
     while True:
         if current_value:
             value = Prompt.ask(prompt, default=current_value).strip()
@@ -47,57 +70,101 @@ def get_valid_input(prompt: str, current_value: str = "") -> str:
 
 def ensure_ssh_config():
     """Ensure SSH config directory and file exist"""
-    ssh_dir = Path.home() / ".ssh"
-    ssh_dir.mkdir(mode=0o700, exist_ok=True)
+    _SSH_DIR.mkdir(mode=0o700, exist_ok=True)
     
-    config_path = Path(SSH_CONFIG_PATH)
-    if not config_path.exists():
-        config_path.touch(mode=0o600)
+    try:
+        os.close(os.open(SSH_CONFIG_PATH, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+    except FileExistsError:
+        pass
 
 def parse_ssh_config() -> List[Dict]:
     """Parse SSH config file and return sorted server list"""
     servers = []
     try:
-        if not os.path.exists(SSH_CONFIG_PATH):
+        try:
+            st = os.stat(SSH_CONFIG_PATH)
+        except FileNotFoundError:
             return servers
 
-        with open(SSH_CONFIG_PATH, "r") as f:
-            content = f.read()
+        cache_key = (SSH_CONFIG_PATH, st.st_mtime_ns, st.st_size)
+        if _PARSE_CACHE["key"] == cache_key:
+            return list(_PARSE_CACHE["value"])
 
-        blocks = re.split(r'\n(?=Host\s+)', content)
-        
-        for block in blocks:
-            if not block.strip() or block.startswith('Include'):
-                continue
-                
-            host_match = re.match(r'Host\s+(.+?)(?:\n|$)', block)
-            if not host_match:
+        fd = os.open(SSH_CONFIG_PATH, os.O_RDONLY)
+        try:
+            content = os.read(fd, st.st_size).decode("utf-8", "replace")
+        finally:
+            os.close(fd)
+
+        current = None
+        lines = []
+        # The trailing "Host" sentinel flushes the last block
+        for raw in content.splitlines() + ["Host"]:
+            line = raw.strip()
+            if not line or line.startswith(('#', 'Include ', 'Include\t')):
                 continue
-                
-            host = host_match.group(1).strip()
-            
-            hostname_match = re.search(r'(?:^|\n)\s*HostName\s+(.+?)(?:\n|$)', block)
-            user_match = re.search(r'(?:^|\n)\s*User\s+(.+?)(?:\n|$)', block)
-            identity_match = re.search(r'(?:^|\n)\s*IdentityFile\s+(.+?)(?:\n|$)', block)
-            port_match = re.search(r'(?:^|\n)\s*Port\s+(.+?)(?:\n|$)', block)
-            
-            if hostname_match:
-                servers.append({
-                    "host": host,
-                    "hostname": hostname_match.group(1).strip(),
-                    "user": user_match.group(1).strip() if user_match else "-",
-                    "identity": identity_match.group(1).strip() if identity_match else None,
-                    "port": port_match.group(1).strip() if port_match else "22",
-                    "raw_config": block  # Store original config block
-                })
+
+            parts = line.split(None, 1)
+            key = parts[0].lower()
+            value = parts[1].strip() if len(parts) > 1 else ""
+
+            # A Match block also ends the current Host; its options are not ours
+            if key in ("host", "match"):
+                if current and "hostname" in current:
+                    servers.append({
+                        "host": current["host"],
+                        "host_lower": current["host"].lower(),
+                        "hostname": current["hostname"],
+                        "user": current.get("user", "-"),
+                        "identity": current.get("identity"),
+                        "port": current.get("port", "22"),
+                        "raw_config": "\n".join(lines)  # Store original config block
+                    })
+                current = {"host": value} if key == "host" else None
+                lines = [raw]
+            elif current is not None:
+                lines.append(raw)
+                field = _CONFIG_KEYS.get(key)
+                # First value wins, as in ssh itself
+                if field and field not in current:
+                    current[field] = value
 
     except Exception as e:
         console.print(f"[red]Error parsing SSH config: {str(e)}[/red]")
-        
-    return sorted(servers, key=lambda x: x["host"].lower())
+        servers.sort(key=itemgetter("host_lower"))
+        return servers
+
+    servers.sort(key=itemgetter("host_lower"))
+    _PARSE_CACHE["key"] = cache_key
+    _PARSE_CACHE["value"] = servers
+    return list(servers)
+
+def _split_host_blocks(content: str) -> List[Tuple[str, str]]:
+    """Split config text into (host, text) blocks at each Host or Match line
+
+    The first block holds anything before the first Host line and has no host;
+    Match blocks have no host either, matching parse_ssh_config's boundaries.
+    """
+    blocks = [(None, [])]
+    for line in content.splitlines(keepends=True):
+        parts = line.split(None, 1)
+        keyword = parts[0].lower() if parts else ""
+        if keyword == "host":
+            blocks.append((parts[1].strip() if len(parts) > 1 else "", []))
+        elif keyword == "match":
+            blocks.append((None, []))
+        blocks[-1][1].append(line)
+    return [(host, "".join(lines)) for host, lines in blocks]
 
 def display_header():
     """Display application header"""
+    if not _IS_TTY:
+        return
+
+    from rich import box
+    from rich.panel import Panel
+    from rich.text import Text
+
     header = Text()
     header.append("🚀 ", style="bold green")
     header.append("ossh", style="bold blue")
@@ -112,6 +179,23 @@ def list_servers() -> List[Dict]:
         console.print("[yellow]No servers configured yet. Use --create to add a new server.[/yellow]")
         return []
 
+    auth_key, auth_pw = "SSH Key", "Password"
+    rows = [
+        (str(idx), s["host"], s["hostname"], s["user"], s["port"],
+         auth_key if s["identity"] else auth_pw)
+        for idx, s in enumerate(servers, start=1)
+    ]
+
+    # Plain tab-separated output when piped, skipping rich's layout pass
+    if not _IS_TTY:
+        print("#\tServer Name\tHostname/IP\tUsername\tPort\tAuth Method")
+        for row in rows:
+            print("\t".join(row))
+        return servers
+
+    from rich import box
+    from rich.table import Table
+
     table = Table(box=box.ROUNDED, title="[bold]Available SSH Servers[/bold]", 
                  title_style="white", header_style="bold blue")
     table.add_column("#", justify="right", style="cyan")
@@ -121,22 +205,16 @@ def list_servers() -> List[Dict]:
     table.add_column("Port", style="blue")
     table.add_column("Auth Method", style="blue")
 
-    for idx, server in enumerate(servers, start=1):
-        auth_method = "SSH Key" if server.get("identity") else "Password"
-        table.add_row(
-            str(idx),
-            server["host"],
-            server["hostname"],
-            server["user"],
-            server["port"],
-            auth_method
-        )
+    for row in rows:
+        table.add_row(*row)
     
     console.print(table)
     return servers
 
 def add_server():
     """Add a new server configuration"""
+    from rich.prompt import Prompt, Confirm
+
     console.print("\n[bold blue]📝 Add New Server Configuration[/bold blue]")
     
     server_name = get_valid_input("Enter server name")
@@ -149,25 +227,32 @@ def add_server():
         default=False
     )
     
+    buf = [
+        f"\nHost {server_name}\n",
+        f"    HostName {hostname}\n",
+        f"    User {username}\n"
+    ]
+    if port != "22":
+        buf.append(f"    Port {port}\n")
+    
+    if not use_password:
+        key_path = Prompt.ask(
+            "Enter SSH key path",
+            default=DEFAULT_SSH_KEY,
+            show_default=True
+        ).strip()
+        buf.append(f"    IdentityFile {key_path}\n")
+
     with open(SSH_CONFIG_PATH, "a") as f:
-        f.write(f"\nHost {server_name}\n")
-        f.write(f"    HostName {hostname}\n")
-        f.write(f"    User {username}\n")
-        if port != "22":
-            f.write(f"    Port {port}\n")
-        
-        if not use_password:
-            key_path = Prompt.ask(
-                "Enter SSH key path",
-                default=DEFAULT_SSH_KEY,
-                show_default=True
-            ).strip()
-            f.write(f"    IdentityFile {key_path}\n")
+        f.write("".join(buf))
+    _PARSE_CACHE["key"] = None
     
     console.print(f"\n[bold green]✅ Server [white]{server_name}[/white] added successfully![/bold green]")
 
 def edit_server():
     """Edit existing server configuration"""
+    from rich.prompt import Prompt, Confirm
+
     servers = list_servers()
     if not servers:
         return
@@ -190,22 +275,15 @@ def edit_server():
 
         # Read the entire config file
         with open(SSH_CONFIG_PATH, "r") as f:
-            config_lines = f.readlines()
-
-        # Find the start and end of the selected server's config block
-        start_index = -1
-        end_index = -1
-        for i, line in enumerate(config_lines):
-            if line.strip().startswith(f"Host {selected['host']}"):
-                start_index = i
-                # Find the end of this block
-                for j in range(i + 1, len(config_lines)):
-                    if j == len(config_lines) - 1 or config_lines[j].startswith("Host "):
-                        end_index = j
-                        break
-                break
-
-        if start_index != -1 and end_index != -1:
+            blocks = _split_host_blocks(f.read())
+
+        # Find the selected server's config block
+        index = next(
+            (i for i, (host, _) in enumerate(blocks) if host == selected["host"]),
+            -1
+        )
+
+        if index != -1:
             # Create new config lines
             new_config = [
                 f"Host {new_name}\n",
@@ -221,12 +299,21 @@ def edit_server():
                 ).strip()
                 new_config.append(f"    IdentityFile {key_path}\n")
 
-            # Replace the old config block with the new one
-            config_lines[start_index:end_index] = new_config
+            # Carry over comments and options ossh does not manage from the old block
+            old_block = blocks[index][1]
+            for line in old_block.rstrip().splitlines()[1:]:
+                parts = line.split(None, 1)
+                if not parts or parts[0].lower() not in _CONFIG_KEYS:
+                    new_config.append(f"{line}\n")
+
+            # Replace the old config block with the new one, keeping its trailing blank lines
+            new_block = "".join(new_config).rstrip("\n") + old_block[len(old_block.rstrip()):]
+            blocks[index] = (new_name, new_block)
 
             # Write back to file
             with open(SSH_CONFIG_PATH, "w") as f:
-                f.writelines(config_lines)
+                f.write("".join(block for _, block in blocks))
+            _PARSE_CACHE["key"] = None
 
             console.print(f"\n[bold green]✅ Server [white]{selected['host']}[/white] updated successfully![/bold green]")
 
@@ -237,6 +324,8 @@ def edit_server():
 
 def connect_server():
     """Connect to selected server"""
+    from rich.prompt import Prompt
+
     servers = list_servers()
     if not servers:
         return
@@ -245,22 +334,27 @@ def connect_server():
         choice = Prompt.ask("\nSelect server number to connect")
         selected = servers[int(choice) - 1]
         
-        console.print(f"\n[bold green]🔌 Connecting to [white]{selected['host']}[/white]...[/bold green]")
+        if _IS_TTY:
+            console.print(f"\n[bold green]🔌 Connecting to [white]{selected['host']}[/white]...[/bold green]")
+        else:
+            print(f"Connecting to {selected['host']}...")
         
-        ssh_cmd = f"ssh"
+        argv = ["ssh"]
         if selected.get("port") != "22":
-            ssh_cmd += f" -p {selected['port']}"
-        ssh_cmd += f" {selected['host']}"
+            argv += ["-p", selected["port"]]
+        # "--" keeps an alias starting with "-" from being read as an option
+        argv += ["--", selected["host"]]
         
-        os.system(ssh_cmd)
+        # Replace this process with ssh; no intermediate shell
+        sys.stdout.flush()
+        os.execvp("ssh", argv)
         
     except (KeyboardInterrupt, EOFError):
         console.print("\n[yellow]Connection cancelled.[/yellow]")
 
 def main():
     """Main application entry point"""
-    # Register signal handlers
-    signal.signal(signal.SIGINT, handle_exit)
+    # Register signal handlers; Ctrl+C surfaces as KeyboardInterrupt below
     signal.signal(signal.SIGTERM, handle_exit)
     
     # Ensure SSH config exists
@@ -289,6 +383,9 @@ def main():
         else:
             connect_server()
             
+    except KeyboardInterrupt:
+        console.print("\n[yellow]👋 Thank you for using ossh! Goodbye![/yellow]")
+        sys.exit(0)
     except Exception as e:
         console.print(f"\n[bold red]Error: {str(e)}[/bold red]")
         sys.exit(1)